@@ -1,19 +1,18 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 from datetime import datetime
 import time
 import sys
 import os
-import yfinance as yf
 import numpy as np
 import requests
-import feedparser
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import json
 import re
+import threading
 from urllib.parse import quote_plus
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Page Config
 st.set_page_config(
@@ -24,7 +23,7 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+_CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -65,46 +64,122 @@ st.markdown("""
         margin-bottom: 0.5rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
 
 # API Keys (Use Streamlit Secrets in production)
 GROQ_API_KEY = st.secrets.get("GROQ_API_KEY", "")
 NEWSAPI_KEY = st.secrets.get("NEWSAPI_KEY", "")
 FINNHUB_API_KEY = st.secrets.get("FINNHUB_API_KEY", "")
 
+# مفاتيح السعر في yfinance حسب الأولوية
+PRICE_KEYS = ('currentPrice', 'regularMarketPrice', 'previousClose')
+
+# قائمة الأسهم المتابعة (tuple ثابتة وقابلة للاستخدام كمفتاح للتخزين المؤقت)
+FOCUS_TICKERS = (
+    'TSLA', 'NVDA', 'AMD', 'META', 'AAPL', 'MSFT', 'GOOGL', 'AMZN',
+    'PLTR', 'SOUN', 'AI', 'MARA', 'RIOT', 'COIN', 'MSTR',
+    'RIVN', 'LCID', 'NIO', 'XPEV', 'F', 'GM',
+    'JPM', 'BAC', 'V', 'MA', 'WFC', 'C',
+    'JNJ', 'PFE', 'UNH', 'ABBV', 'MRK',
+    'XOM', 'CVX', 'COP', 'SLB',
+    'WMT', 'TGT', 'COST', 'HD', 'LOW',
+    'DIS', 'NFLX', 'PYPL', 'SQ', 'SHOP',
+    'SNOW', 'DDOG', 'NET', 'CRWD', 'ZS',
+    'DASH', 'UBER', 'LYFT', 'ABNB',
+    'NKE', 'MCD', 'SBUX', 'PEP', 'KO',
+    'BA', 'CAT', 'DE', 'MMM',
+    'VZ', 'T', 'TMUS', 'CMCSA',
+    'IBM', 'ORCL', 'CSCO', 'INTC',
+    'GS', 'MS', 'BLK', 'SCHW',
+    'MDT', 'SYK', 'ISRG', 'BDX',
+    'RTX', 'LMT', 'NOC', 'GD',
+    'SPY', 'QQQ', 'IWM', 'DIA'
+)
+assert len(set(FOCUS_TICKERS)) == len(FOCUS_TICKERS), "duplicate tickers in FOCUS_TICKERS"
+
+# yf.download keeps its results in module-level state, so concurrent sessions must not overlap
+_DOWNLOAD_LOCK = threading.Lock()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _download_history(tickers: tuple, minute: datetime):
+    """جلب البيانات التاريخية لكل الأسهم بطلب واحد (مخزنة مؤقتاً لمدة دقيقة)"""
+    import yfinance as yf
+    
+    # Errors propagate so st.cache_data does not cache a failed download
+    with _DOWNLOAD_LOCK:
+        # auto_adjust=True matches Ticker.history(), so Change % ignores dividend drops
+        hist_all = yf.download(" ".join(tickers), period='2d', group_by='ticker', auto_adjust=True, threads=True, progress=False)
+    
+    if hist_all.empty:
+        raise ValueError("yf.download returned no price history")
+    
+    return hist_all
+
+def _ticker_history(hist_all, ticker):
+    """استخراج البيانات التاريخية لسهم واحد من التحميل المجمّع"""
+    if isinstance(hist_all.columns, pd.MultiIndex):
+        return hist_all[ticker].dropna() if ticker in hist_all.columns else hist_all.iloc[:0]
+    return hist_all.dropna()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_info(ticker: str, minute: datetime):
+    """جلب معلومات سهم واحد (مخزنة مؤقتاً لمدة دقيقة)"""
+    import yfinance as yf
+    
+    return yf.Ticker(ticker).info
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_yahoo_news(ticker: str, _session: requests.Session) -> list[dict]:
+    """جلب أخبار السهم من Yahoo RSS (مخزنة مؤقتاً لمدة 5 دقائق)"""
+    import feedparser
+    
+    news_items = []
+    
+    # Yahoo RSS (errors propagate so st.cache_data does not cache a failed fetch)
+    url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker}"
+    resp = _session.get(url, timeout=3)
+    resp.raise_for_status()
+    feed = feedparser.parse(resp.content)
+    
+    for entry in feed.entries[:3]:
+        news_items.append({
+            'title': entry.title,
+            'summary': entry.get('summary', '')[:150],
+            'link': entry.link,
+            'source': 'Yahoo Finance'
+        })
+    
+    return news_items[:3]
+
 class MarketScanner:
+    focus_tickers = FOCUS_TICKERS
+    
     def __init__(self):
-        self.focus_tickers = [
-            'TSLA', 'NVDA', 'AMD', 'META', 'AAPL', 'MSFT', 'GOOGL', 'AMZN',
-            'PLTR', 'SOUN', 'AI', 'MARA', 'RIOT', 'COIN', 'MSTR',
-            'RIVN', 'LCID', 'NIO', 'XPEV', 'F', 'GM',
-            'JPM', 'BAC', 'V', 'MA', 'WFC', 'C',
-            'JNJ', 'PFE', 'UNH', 'ABBV', 'MRK',
-            'XOM', 'CVX', 'COP', 'SLB',
-            'WMT', 'TGT', 'COST', 'HD', 'LOW',
-            'DIS', 'NFLX', 'PYPL', 'SQ', 'SHOP',
-            'SNOW', 'DDOG', 'NET', 'CRWD', 'ZS',
-            'DASH', 'UBER', 'LYFT', 'ABNB',
-            'NKE', 'MCD', 'SBUX', 'PEP', 'KO',
-            'BA', 'CAT', 'DE', 'MMM',
-            'VZ', 'T', 'TMUS', 'CMCSA',
-            'IBM', 'ORCL', 'CSCO', 'INTC',
-            'GS', 'MS', 'BLK', 'SCHW',
-            'MDT', 'SYK', 'ISRG', 'BDX',
-            'RTX', 'LMT', 'NOC', 'GD',
-            'SPY', 'QQQ', 'IWM', 'DIA'
-        ]
-    
-    def get_stock_data(self, ticker):
+        # كلمات المشاعر (تعبير منتظم واحد لكل اتجاه)
+        # Each pattern captures whole words that start with a keyword (gains, upgrades, ...)
+        self._pos_words = ('profit', 'gain', 'up', 'rise', 'bullish', 'buy', 'upgrade')
+        self._neg_words = ('loss', 'down', 'fall', 'bearish', 'sell', 'downgrade')
+        self._pos_re = re.compile(r'\b(?:' + '|'.join(map(re.escape, self._pos_words)) + r')\w*')
+        self._neg_re = re.compile(r'\b(?:' + '|'.join(map(re.escape, self._neg_words)) + r')\w*')
+        
+        # مجموعات خيوط دائمة يُعاد استخدامها بين عمليات الفحص: {الاسم: (الحجم، المجموعة)}
+        self._pools = {}
+        
+        # جلسة HTTP مشتركة لإعادة استخدام الاتصالات (keep-alive)
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=1))
+    
+    def get_stock_data(self, ticker, hist_all):
         """جلب بيانات سهم واحد"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            # Bucket by minute so live data is refreshed at most once a minute
+            minute = datetime.now().replace(second=0, microsecond=0)
+            info = _fetch_info(ticker, minute)
             
             # الحصول على السعر
-            price_keys = ['currentPrice', 'regularMarketPrice', 'previousClose']
             price = 0
-            for key in price_keys:
+            for key in PRICE_KEYS:
                 if key in info and info[key]:
                     price = info[key]
                     break
@@ -112,8 +187,8 @@ class MarketScanner:
             if price == 0:
                 return None
             
-            # الحصول على البيانات التاريخية
-            hist = stock.history(period='2d')
+            # الحصول على البيانات التاريخية من التحميل المجمّع
+            hist = _ticker_history(hist_all, ticker)
             if len(hist) >= 2:
                 current_close = hist['Close'].iloc[-1]
                 prev_close = hist['Close'].iloc[-2]
@@ -141,44 +216,24 @@ class MarketScanner:
     
     def get_stock_news(self, ticker):
         """جلب أخبار السهم"""
-        news_items = []
-        
-        # محاولة Yahoo RSS
         try:
-            url = f"https://feeds.finance.yahoo.com/rss/2.0/headline?s={ticker}"
-            feed = feedparser.parse(url)
-            
-            for entry in feed.entries[:3]:
-                news_items.append({
-                    'title': entry.title,
-                    'summary': entry.get('summary', '')[:150],
-                    'link': entry.link,
-                    'source': 'Yahoo Finance'
-                })
-        except:
-            pass
-        
-        return news_items[:3]
+            return _fetch_yahoo_news(ticker, self.session)
+        except Exception as e:
+            return []
     
     def analyze_sentiment(self, news_items):
         """تحليل مشاعر الأخبار"""
         if not news_items:
             return {'sentiment': 'NEUTRAL', 'score': 0, 'confidence': 0}
         
-        positive_words = ['profit', 'gain', 'up', 'rise', 'bullish', 'buy', 'upgrade']
-        negative_words = ['loss', 'down', 'fall', 'bearish', 'sell', 'downgrade']
-        
-        sentiment_score = 0
-        for news in news_items:
-            text = f"{news['title']} {news['summary']}".lower()
-            
-            for word in positive_words:
-                if word in text:
-                    sentiment_score += 1
-            
-            for word in negative_words:
-                if word in text:
-                    sentiment_score -= 1
+        texts = [' '.join((news.get('title', ''), news.get('summary', ''))).lower() for news in news_items]
+        # One point per keyword present in a headline, as before: a matched word counts
+        # every keyword it starts with ('upgrades' counts both 'up' and 'upgrade')
+        sentiment_score = sum(
+            len({w for m in self._pos_re.findall(text) for w in self._pos_words if m.startswith(w)})
+            - len({w for m in self._neg_re.findall(text) for w in self._neg_words if m.startswith(w)})
+            for text in texts
+        )
         
         if sentiment_score > 1:
             sentiment = 'BULLISH'
@@ -233,6 +288,167 @@ class MarketScanner:
             return 'HOLD ⚪'
         else:
             return 'AVOID 🔴'
+    
+    def _get_pool(self, name, max_workers):
+        """إرجاع مجموعة الخيوط الدائمة بالحجم المطلوب (تُستبدل فقط عند تغيير الحجم)"""
+        size, pool = self._pools.get(name, (None, None))
+        if size != max_workers:
+            if pool is not None:
+                pool.shutdown(wait=False)
+            pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'scanner-{name}')
+            self._pools[name] = (max_workers, pool)
+        return pool
+    
+    def _prefilter(self, tickers, hist_all, min_volume):
+        """استبعاد الأسهم ذات الحجم المنخفض حسب البيانات التاريخية قبل جلب المعلومات والأخبار"""
+        candidates = []
+        for ticker in tickers:
+            hist = _ticker_history(hist_all, ticker)
+            
+            # بدون بيانات تاريخية كافية نترك القرار لمرحلة الفلترة الكاملة
+            # Volume only: get_stock_data uses this same value, while its price comes from .info
+            if len(hist) < 2 or hist['Volume'].iloc[-1] >= min_volume:
+                candidates.append(ticker)
+        
+        return candidates
+    
+    def _enrich(self, stock_data):
+        """جلب الأخبار وتحليلها وحساب الدرجة لسهم واحد"""
+        ticker = stock_data['Ticker']
+        
+        # Get news
+        news_items = self.get_stock_news(ticker)
+        
+        # Analyze sentiment
+        sentiment_data = self.analyze_sentiment(news_items)
+        
+        # Calculate score
+        score = self.calculate_score(stock_data, sentiment_data)
+        
+        # Get recommendation
+        recommendation = self.get_recommendation(score, sentiment_data['sentiment'])
+        
+        return {
+            **stock_data,
+            'News_Count': len(news_items),
+            'Sentiment': sentiment_data['sentiment'],
+            'Confidence': sentiment_data['confidence'],
+            'Score': score,
+            'Recommendation': recommendation,
+            'Latest_News': news_items[0]['title'][:50] + "..." if news_items else "No news"
+        }
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_score_hist(scores: tuple):
+    """رسم توزيع الدرجات"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(data=[go.Histogram(x=list(scores), nbinsx=20)])
+    fig.update_layout(
+        title='توزيع الدرجات',
+        xaxis_title='الدرجة',
+        yaxis_title='عدد الأسهم'
+    )
+    return fig
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_sentiment_pie(sentiments: tuple):
+    """رسم توزيع المشاعر"""
+    import plotly.graph_objects as go
+    
+    sentiment_counts = pd.Series(sentiments).value_counts()
+    fig = go.Figure(data=[go.Pie(
+        labels=sentiment_counts.index,
+        values=sentiment_counts.values,
+        hole=.3
+    )])
+    fig.update_layout(title='توزيع المشاعر')
+    return fig
+
+def _in_script_ctx(ctx, func, *args):
+    """تشغيل دالة في خيط عامل ضمن سياق تشغيل Streamlit الحالي"""
+    # st.cache_data only reads/writes when the thread has a ScriptRunContext
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return func(*args)
+
+def _collect(futures, progress_bar, offset, span):
+    """انتظار المهام مع تحديث شريط التقدم كل ~5% ثم جمع نتائجها بترتيب الإرسال"""
+    step = max(1, len(futures) // 20)
+    for i, future in enumerate(as_completed(futures)):
+        # Update progress (every ~5% to limit frontend messages)
+        if (i + 1) % step == 0 or i == len(futures) - 1:
+            progress_bar.progress(offset + (i + 1) / len(futures) * span)
+    
+    # Submission (ticker) order keeps results deterministic regardless of network timing
+    return [result for result in (future.result() for future in futures) if result]
+
+# st.fragment only exists in newer Streamlit releases; fall back to a plain call
+fragment = getattr(st, "fragment", getattr(st, "experimental_fragment", lambda func: func))
+
+@fragment
+def display_results():
+    """عرض نتائج آخر فحص"""
+    df = pd.DataFrame.from_records(st.session_state.results)
+    
+    # Summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("📈 إجمالي الأسهم", len(df))
+    with col2:
+        avg_score = df['Score'].mean()
+        st.metric("🎯 متوسط الدرجة", f"{avg_score:.1f}")
+    with col3:
+        bullish = int((df['Sentiment'] == 'BULLISH').sum())
+        st.metric("🟢 إيجابية", bullish)
+    with col4:
+        strong_buys = int(df['Recommendation'].str.contains('STRONG BUY', regex=False).sum())
+        st.metric("🏆 توصيات قوية", strong_buys)
+    
+    # Display table
+    st.divider()
+    st.subheader("🏆 أفضل الأسهم")
+    
+    df_display = df.loc[:, ['Ticker', 'Company', 'Price', 'Change %', 'Sentiment', 'Score', 'Recommendation']].head(20)
+    
+    # Format and display
+    st.dataframe(
+        df_display.style.format({
+            'Price': '${:.2f}',
+            'Change %': '{:.2f}%',
+            'Score': '{:.1f}'
+        }),
+        use_container_width=True,
+        height=500
+    )
+    
+    # Charts
+    st.divider()
+    st.subheader("📊 التصورات البيانية")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Score distribution
+        fig1 = _build_score_hist(tuple(df['Score']))
+        st.plotly_chart(fig1, use_container_width=True)
+    
+    with col2:
+        # Sentiment pie chart
+        fig2 = _build_sentiment_pie(tuple(df['Sentiment']))
+        st.plotly_chart(fig2, use_container_width=True)
+    
+    # Export option
+    st.divider()
+    st.subheader("💾 تصدير النتائج")
+    
+    csv = df.to_csv(index=False, encoding='utf-8-sig')
+    st.download_button(
+        label="📥 تحميل كملف CSV",
+        data=csv,
+        file_name=f"trading_scan_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+        mime="text/csv"
+    )
 
 def main():
     # Title
@@ -253,6 +469,13 @@ def main():
         min_price = st.slider("الحد الأدنى للسعر:", 0.0, 200.0, 1.0)
         min_volume = st.number_input("الحد الأدنى للحجم:", value=100000, step=10000)
         
+        # Thread counts: both steps are network-bound (yfinance info / RSS feeds).
+        # Defaults don't depend on the scan mode so switching modes keeps the pools;
+        # news stays at 10 (the shared HTTP session holds at most 20 connections)
+        with st.expander("🛠️ إعدادات متقدمة"):
+            fetch_workers = st.slider("خيوط جلب البيانات:", 1, 100, min(50, len(FOCUS_TICKERS)))
+            enrich_workers = st.slider("خيوط تحليل الأخبار:", 1, 20, 10)
+        
         # Scan button
         if st.button("🔍 بدء الفحص", type="primary", use_container_width=True):
             st.session_state.scan_triggered = True
@@ -273,8 +496,10 @@ def main():
         else:
             st.info("📰 News APIs: Using RSS Feeds")
     
-    # Initialize scanner
-    scanner = MarketScanner()
+    # Initialize scanner (kept in session state so its thread pools survive reruns)
+    if 'scanner' not in st.session_state:
+        st.session_state.scanner = MarketScanner()
+    scanner = st.session_state.scanner
     
     # Scan results
     if 'scan_triggered' in st.session_state and st.session_state.scan_triggered:
@@ -286,49 +511,46 @@ def main():
             else:
                 tickers = scanner.focus_tickers
             
+            # Price history for all tickers in one batched request
+            minute = datetime.now().replace(second=0, microsecond=0)
+            try:
+                hist_all = _download_history(tickers, minute)
+            except Exception as e:
+                # Without history every ticker falls back to .info volume and 0% change
+                hist_all = pd.DataFrame()
+            
+            # Skip info/news requests for tickers whose history already fails the volume filter
+            tickers = scanner._prefilter(tickers, hist_all, min_volume)
+            
             # Progress bar
             progress_bar = st.progress(0)
             
-            # Scan stocks
+            # Worker threads need the script's context for the cached fetchers to work
+            ctx = get_script_run_ctx()
+            
+            # Stock data for every ticker (network-bound, so fetch concurrently)
+            fetch_pool = scanner._get_pool('fetch', fetch_workers)
+            futures = [fetch_pool.submit(_in_script_ctx, ctx, scanner.get_stock_data, t, hist_all) for t in tickers]
+            records = _collect(futures, progress_bar, 0.0, 0.5)
+            
             results = []
-            for i, ticker in enumerate(tickers):
-                # Get stock data
-                stock_data = scanner.get_stock_data(ticker)
-                
-                if stock_data and stock_data['Price'] >= min_price and stock_data['Volume'] >= min_volume:
-                    # Get news
-                    news_items = scanner.get_stock_news(ticker)
-                    
-                    # Analyze sentiment
-                    sentiment_data = scanner.analyze_sentiment(news_items)
-                    
-                    # Calculate score
-                    score = scanner.calculate_score(stock_data, sentiment_data)
-                    
-                    # Get recommendation
-                    recommendation = scanner.get_recommendation(score, sentiment_data['sentiment'])
-                    
-                    # Prepare result
-                    result = {
-                        **stock_data,
-                        'News_Count': len(news_items),
-                        'Sentiment': sentiment_data['sentiment'],
-                        'Confidence': sentiment_data['confidence'],
-                        'Score': score,
-                        'Recommendation': recommendation,
-                        'Latest_News': news_items[0]['title'][:50] + "..." if news_items else "No news"
-                    }
-                    
-                    results.append(result)
+            if records:
+                # Apply the price/volume filters in one vectorized pass
+                df = pd.DataFrame.from_records(records)
+                df = df.query('Price >= @min_price and Volume >= @min_volume')
                 
-                # Update progress
-                progress_bar.progress((i + 1) / len(tickers))
+                # News, sentiment and scoring only for the stocks that passed
+                enrich_pool = scanner._get_pool('enrich', enrich_workers)
+                futures = [enrich_pool.submit(_in_script_ctx, ctx, scanner._enrich, stock_data) for stock_data in df.to_dict('records')]
+                results = _collect(futures, progress_bar, 0.5, 0.5)
             
             progress_bar.empty()
             
             if results:
-                # Sort by score
-                results.sort(key=lambda x: x['Score'], reverse=True)
+                # Sort by score (stable, so ties keep ticker order)
+                scores = np.array([r['Score'] for r in results])
+                order = np.argsort(-scores, kind='stable')
+                results = [results[i] for i in order]
                 
                 # Store in session state
                 st.session_state.results = results
@@ -337,83 +559,15 @@ def main():
                 # Show summary
                 st.success(f"✅ تم العثور على {len(results)} سهم")
                 
-                # Summary metrics
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("📈 إجمالي الأسهم", len(results))
-                with col2:
-                    avg_score = sum(r['Score'] for r in results) / len(results)
-                    st.metric("🎯 متوسط الدرجة", f"{avg_score:.1f}")
-                with col3:
-                    bullish = sum(1 for r in results if r['Sentiment'] == 'BULLISH')
-                    st.metric("🟢 إيجابية", bullish)
-                with col4:
-                    strong_buys = sum(1 for r in results if 'STRONG BUY' in r['Recommendation'])
-                    st.metric("🏆 توصيات قوية", strong_buys)
-                
-                # Display table
-                st.divider()
-                st.subheader("🏆 أفضل الأسهم")
-                
-                # Create DataFrame
-                df = pd.DataFrame(results)
-                df_display = df[['Ticker', 'Company', 'Price', 'Change %', 'Sentiment', 'Score', 'Recommendation']].head(20)
-                
-                # Format and display
-                st.dataframe(
-                    df_display.style.format({
-                        'Price': '${:.2f}',
-                        'Change %': '{:.2f}%',
-                        'Score': '{:.1f}'
-                    }),
-                    use_container_width=True,
-                    height=500
-                )
-                
-                # Charts
-                st.divider()
-                st.subheader("📊 التصورات البيانية")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Score distribution
-                    fig1 = go.Figure(data=[go.Histogram(x=df['Score'], nbinsx=20)])
-                    fig1.update_layout(
-                        title='توزيع الدرجات',
-                        xaxis_title='الدرجة',
-                        yaxis_title='عدد الأسهم'
-                    )
-                    st.plotly_chart(fig1, use_container_width=True)
-                
-                with col2:
-                    # Sentiment pie chart
-                    sentiment_counts = df['Sentiment'].value_counts()
-                    fig2 = go.Figure(data=[go.Pie(
-                        labels=sentiment_counts.index,
-                        values=sentiment_counts.values,
-                        hole=.3
-                    )])
-                    fig2.update_layout(title='توزيع المشاعر')
-                    st.plotly_chart(fig2, use_container_width=True)
-                
-                # Export option
-                st.divider()
-                st.subheader("💾 تصدير النتائج")
-                
-                csv = df.to_csv(index=False, encoding='utf-8-sig')
-                st.download_button(
-                    label="📥 تحميل كملف CSV",
-                    data=csv,
-                    file_name=f"trading_scan_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    mime="text/csv"
-                )
-                
             else:
+                st.session_state.results = []
                 st.error("❌ لم يتم العثور على أسهم تطبق المعايير")
     
-    else:
+    # Results persist in session state, so they survive reruns without rescanning
+    if st.session_state.get('results'):
+        display_results()
+    
+    elif not st.session_state.scan_triggered:
         # Welcome screen
         st.markdown("""
         <div style="text-align: center; padding: 3rem;">